@@ -0,0 +1,386 @@
+# Imports
+import os
+import re
+import gzip
+import json
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from html_scrape import parse_planner_section, iter_meal_plan
+from calendar_invite import (create_calendar, load_meal_plan, save_calendar_shards,
+                             iter_zip_bundle, SHARD_PERIODS)
+
+# Largest HTML upload accepted, in bytes
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+CONTENT_TYPES = {'json': 'application/json', 'ics': 'text/calendar'}
+
+def convert_html(html_content, fmt='json', compress=False):
+    """
+    Convert planner HTML to a JSON meal plan or an ICS calendar.
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    Args:
+        html_content: HTML content as a string
+        fmt: 'json' or 'ics'
+        compress: If True, merge repeating meals into recurring events (ics only)
+
+    Returns:
+        Converted file as bytes, or None if the page has no date cards
+    """
+    soup = parse_planner_section(html_content)
+    meal_plan = dict(iter_meal_plan(soup))
+    if not meal_plan:
+        return None
+    if fmt == 'ics':
+        return create_calendar(meal_plan, compress=compress).to_ical()
+    return json.dumps(meal_plan).encode('utf-8')
+
+class QueueFullError(Exception):
+    """Raised when the conversion queue has no free slots."""
+
+class ConversionService:
+    """
+    Runs conversions in a process pool with a bounded number of queued jobs.
+
+    Identical uploads that arrive while the first one is still being converted
+    share its result instead of being parsed again. If a worker process dies
+    the pool is replaced on the next submission.
+    """
+    def __init__(self, workers=None, max_pending=32):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def submit(self, html_content, fmt, compress=False):
+        """
+        Queue a conversion, or join an identical one already in flight.
+
+        Returns:
+            concurrent.futures.Future resolving to the converted bytes
+
+        Raises:
+            QueueFullError: If max_pending conversions are already queued
+        """
+        key = hashlib.sha256(html_content.encode('utf-8')).hexdigest() + f":{fmt}:{compress}"
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future
+            if not self.slots.acquire(blocking=False):
+                raise QueueFullError()
+            try:
+                future = self._submit_locked(html_content, fmt, compress)
+            except Exception:
+                self.slots.release()
+                raise
+            self.in_flight[key] = future
+
+        def _done(_):
+            with self.lock:
+                self.in_flight.pop(key, None)
+            self.slots.release()
+
+        future.add_done_callback(_done)
+        return future
+
+    def _submit_locked(self, html_content, fmt, compress):
+        try:
+            return self.executor.submit(convert_html, html_content, fmt, compress)
+        except BrokenProcessPool:
+            print("Worker process died, restarting the process pool")
+            self.executor.shutdown(wait=False)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor.submit(convert_html, html_content, fmt, compress)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class FeedCache:
+    """
+    Serialized ICS feeds for the meal plans in a directory, kept in identity
+    and gzip form and regenerated only when a plan file's content changes.
+    """
+    def __init__(self, plans_dir="meal_plans", cal_dir=None):
+        self.plans_dir = plans_dir
+        # Shards are written next to the plans, not into the working directory
+        self.cal_dir = cal_dir or os.path.join(os.path.dirname(os.path.abspath(plans_dir)), "cal_invites")
+        # One lock per plan, so a slow rebuild only holds up that plan
+        self.locks_lock = threading.Lock()
+        self.feed_locks = {}
+        self.shard_locks = {}
+        self.feeds = {}
+
+    def _lock(self, locks, name):
+        with self.locks_lock:
+            return locks.setdefault(name, threading.Lock())
+
+    def shard_lock(self, name, period):
+        """
+        Lock held while writing and streaming one period's shards of a plan.
+        """
+        return self._lock(self.shard_locks, (name, period))
+
+    def get(self, name):
+        """
+        Return the cached feed for a plan, rebuilding it if the plan changed.
+
+        Args:
+            name: Meal plan filename without the .json extension
+
+        Returns:
+            Dictionary with 'etag', 'gzip_etag', 'identity' and 'gzip' keys,
+            or None if there is no such plan
+        """
+        if not re.fullmatch(r'[A-Za-z0-9._-]+', name) or name.startswith('.'):
+            return None
+        path = os.path.join(self.plans_dir, f"{name}.json")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock(self.feed_locks, name):
+            feed = self.feeds.get(name)
+            if feed and feed["signature"] == signature:
+                return feed
+
+            with open(path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            # Rewritten with the same content, nothing to regenerate
+            if feed and feed["hash"] == content_hash:
+                feed["signature"] = signature
+                return feed
+
+            meal_plan = load_meal_plan(path)
+            if meal_plan is None:
+                return None
+            # DTSTAMP comes from the plan file, and the ETags from the bytes
+            # served, so a rebuild never serves different bytes under one ETag
+            dtstamp = datetime.fromtimestamp(stat.st_mtime_ns / 1e9)
+            ics = create_calendar(meal_plan, dtstamp=dtstamp).to_ical()
+            ics_hash = hashlib.sha256(ics).hexdigest()
+            feed = {
+                "signature": signature,
+                "hash": content_hash,
+                "etag": f'"{ics_hash}"',
+                "gzip_etag": f'"{ics_hash}-gzip"',
+                "identity": ics,
+                "gzip": gzip.compress(ics, mtime=0),
+            }
+            self.feeds[name] = feed
+            return feed
+
+def etag_matches(if_none_match, etags):
+    """
+    Check an If-None-Match header against the ETags of a resource.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return any(etag in candidates for etag in etags)
+
+def accepts_gzip(accept_encoding):
+    """
+    Check whether an Accept-Encoding header allows gzip.
+    """
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+class ConvertHandler(BaseHTTPRequestHandler):
+    """
+    POST /convert?format=json|ics[&compress=1] with the planner HTML as the body.
+    GET /feeds/<plan>.ics for a subscribable calendar of a saved meal plan.
+    GET /feeds/<plan>.zip?period=month|week for the plan as a zip of per-period calendars.
+    """
+    protocol_version = "HTTP/1.1"
+    service = None
+    feeds = None
+
+    def _send(self, status, body=b"", content_type="text/plain; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/health':
+            self._send(200, b"ok\n")
+        elif path.startswith('/feeds/') and path.endswith('.ics'):
+            self._send_feed(path[len('/feeds/'):-len('.ics')])
+        elif path.startswith('/feeds/') and path.endswith('.zip'):
+            period = parse_qs(urlsplit(self.path).query).get('period', ['month'])[0]
+            self._send_bundle(path[len('/feeds/'):-len('.zip')], period)
+        else:
+            self._send(404, b"Not found\n")
+
+    do_HEAD = do_GET
+
+    def _send_feed(self, name):
+        feed = self.feeds.get(name)
+        if feed is None:
+            self._send(404, b"Not found\n")
+            return
+
+        # Each encoding is a different representation, so it gets its own strong ETag
+        gzip_etag = feed["gzip_etag"]
+        use_gzip = accepts_gzip(self.headers.get('Accept-Encoding'))
+        etag = gzip_etag if use_gzip else feed["etag"]
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if etag_matches(self.headers.get('If-None-Match'), (feed["etag"], gzip_etag)):
+            self.send_response(304)
+            for header, value in headers.items():
+                self.send_header(header, value)
+            self.end_headers()
+            return
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            body = feed["gzip"]
+        else:
+            body = feed["identity"]
+        self._send(200, body, content_type="text/calendar; charset=utf-8", headers=headers)
+
+    def _reject(self, status, body):
+        # The request body has not been read, so the connection can't be reused
+        self._send(status, body, headers={"Connection": "close"})
+        self.close_connection = True
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self._reject(404, b"Not found\n")
+            return
+
+        params = parse_qs(url.query)
+        fmt = params.get('format', ['json'])[0]
+        compress = params.get('compress', ['0'])[0] in ('1', 'true', 'yes')
+        if fmt not in CONTENT_TYPES:
+            self._reject(400, b"format must be json or ics\n")
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self._reject(400, b"Invalid Content-Length\n")
+            return
+        if length <= 0:
+            self._reject(400, b"Request body must contain the planner HTML\n")
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self._reject(413, b"Upload too large\n")
+            return
+        html_content = self.rfile.read(length).decode('utf-8', errors='replace')
+
+        try:
+            future = self.service.submit(html_content, fmt, compress)
+        except QueueFullError:
+            self._send(503, b"Server busy, retry shortly\n", headers={"Retry-After": "1"})
+            return
+
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            # The pool is replaced on the next submission
+            self._send(503, b"Worker restarting, retry shortly\n", headers={"Retry-After": "1"})
+            return
+        except Exception as e:
+            print(f"Error converting upload: {e}")
+            self._send(500, b"Conversion failed\n")
+            return
+
+        if result is None:
+            self._send(422, b"No date elements found in the HTML file\n")
+        else:
+            self._send(200, result, content_type=CONTENT_TYPES[fmt])
+
+    def _send_bundle(self, name, period):
+        if period not in SHARD_PERIODS:
+            self._send(400, b"period must be month or week\n")
+            return
+        # The feed cache validates the name and tells us whether the plan exists
+        if self.feeds.get(name) is None:
+            self._send(404, b"Not found\n")
+            return
+
+        meal_plan = load_meal_plan(os.path.join(self.feeds.plans_dir, f"{name}.json"))
+        # Held while streaming too, so no other request rewrites a shard mid-zip
+        with self.feeds.shard_lock(name, period):
+            paths, _ = save_calendar_shards(meal_plan, name, period, cal_dir=self.feeds.cal_dir)
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Disposition", f'attachment; filename="{name}_{period}.zip"')
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            if self.command == 'HEAD':
+                return
+            for chunk in iter_zip_bundle(paths):
+                if chunk:
+                    self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        # Keep the console quiet under load, errors are printed explicitly
+        pass
+
+def run_server(host="127.0.0.1", port=8000, workers=None, max_pending=32,
+               plans_dir="meal_plans", cal_dir=None, handler=ConvertHandler):
+    """
+    Start the conversion API and serve until interrupted.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+        workers: Number of worker processes (default: number of CPUs)
+        max_pending: Most conversions queued or running before answering 503
+        plans_dir: Directory of meal plan JSON files served under /feeds/
+        cal_dir: Directory for the calendar shards behind /feeds/<plan>.zip
+                 (default: cal_invites next to plans_dir)
+        handler: Request handler class
+    """
+    service = ConversionService(workers=workers, max_pending=max_pending)
+    handler.service = service
+    handler.feeds = FeedCache(plans_dir, cal_dir)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Serving on http://{host}:{port} with {service.executor._max_workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP API converting SenPro HTML to JSON or ICS")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--max-pending", type=int, default=32, help="Queued conversions before answering 503")
+    parser.add_argument("--plans-dir", default="meal_plans", help="Meal plans served as calendar feeds")
+    parser.add_argument("--cal-dir", help="Where calendar shards are written (default: cal_invites next to --plans-dir)")
+    args = parser.parse_args()
+
+    run_server(args.host, args.port, args.workers, args.max_pending, args.plans_dir, args.cal_dir)
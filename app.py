@@ -2,8 +2,9 @@ import streamlit as st
 import os
 import json
 import shutil
-from html_scrape import read_html_file, parse_planner_section, get_dates, select_meals, save_to_json
-from calendar_invite import list_available_meal_plans, load_meal_plan, create_calendar, save_calendar
+from html_scrape import read_html_file, parse_planner_section, iter_meal_plan, save_to_json
+from calendar_invite import (list_available_meal_plans, load_meal_plan, create_calendar, save_calendar,
+                             compression_stats, save_calendar_shards, save_zip_bundle)
 from bs4 import BeautifulSoup
 from datetime import datetime
 
@@ -86,10 +87,10 @@ with tab1:
         # Parse HTML
         soup = BeautifulSoup(html_content, 'html.parser')
         
-        # Get dates
-        dates = get_dates(soup)
+        # Count date cards (get_dates prints every card, which slows big uploads)
+        date_count = len(soup.select("div.date_cards.d-flex.flex-column"))
         
-        if not dates:
+        if not date_count:
             st.error("No date elements found in the HTML file")
             
             # Display available classes for debugging
@@ -102,35 +103,48 @@ with tab1:
             with st.expander("Available CSS classes"):
                 st.write(sorted(list(classes)))
         else:
-            # Process all dates and gather meals
-            meal_plan = {}
+            # The calendar download appears here once every day is extracted
+            download_slot = st.empty()
+            download_slot.info("Extracting meals, the calendar download will appear here when done...")
             progress_bar = st.progress(0)
             
-            for i, curr_date in enumerate(dates):
-                meals = select_meals(soup, curr_date)
+            # Display each day as soon as it has been extracted
+            st.subheader("Meal Plan")
+            meal_plan = {}
+            
+            # Advance the progress bar for every card, including days without meals
+            for i, (date, meals) in enumerate(iter_meal_plan(soup, include_empty=True)):
                 if meals:
-                    meal_plan[curr_date] = meals
-                progress_bar.progress((i + 1) / len(dates))
+                    meal_plan[date] = meals
+                    with st.expander(f"Date: {date}"):
+                        for meal in meals:
+                            if isinstance(meal, dict):
+                                meal_text = meal.get("text", "")
+                                recipe_links = meal.get("recipe_links", {})
+                                
+                                st.write(meal_text)
+                                
+                                if recipe_links:
+                                    st.markdown("**Recipes:**")
+                                    for recipe_name, recipe_url in recipe_links.items():
+                                        st.markdown(f"- [{recipe_name}]({recipe_url})")
+                progress_bar.progress((i + 1) / date_count)
+            progress_bar.empty()
             
             # Store meal plan in session state
             st.session_state.current_meal_plan = meal_plan
             
-            # Display meal plan
-            st.subheader("Meal Plan")
-            
-            for date, meals in meal_plan.items():
-                with st.expander(f"Date: {date}"):
-                    for meal in meals:
-                        if isinstance(meal, dict):
-                            meal_text = meal.get("text", "")
-                            recipe_links = meal.get("recipe_links", {})
-                            
-                            st.write(meal_text)
-                            
-                            if recipe_links:
-                                st.markdown("**Recipes:**")
-                                for recipe_name, recipe_url in recipe_links.items():
-                                    st.markdown(f"- [{recipe_name}]({recipe_url})")
+            if meal_plan:
+                download_slot.download_button(
+                    label="Download plain calendar (.ics)",
+                    data=create_calendar(meal_plan).to_ical(),
+                    file_name=f"meal_plan_{datetime.now().strftime('%Y%m%d')}.ics",
+                    mime="text/calendar",
+                    key="extracted_calendar_download",
+                    help="One event per meal, use Generate Calendar Invites to combine repeats or split the file"
+                )
+            else:
+                download_slot.warning("No meals found in the HTML file")
             
             # Save options
             st.subheader("Save Meal Plan")
@@ -166,6 +180,12 @@ with tab2:
     Generate an iCalendar (.ics) file from your meal plan that you can import into 
     Google Calendar, Apple Calendar, Outlook, or any other calendar application.
     """)
+
+    compress = st.checkbox("Combine meals that repeat on consecutive days into recurring events",
+                           help="Produces a smaller file that imports faster")
+    shard_choice = st.selectbox("Calendar file", ["Single file", "One file per month", "One file per week"],
+                                help="Large calendars import more reliably as several smaller files, downloaded as a zip")
+    shard_period = {"One file per month": "month", "One file per week": "week"}.get(shard_choice)
     
     # Check for current meal plan in session state
     if st.session_state.current_meal_plan:
@@ -186,16 +206,27 @@ with tab2:
                 filename = f"meal_plan_{datetime.now().strftime('%Y%m%d')}"
                 
                 # Generate calendar
-                cal = create_calendar(meal_plan)
-                ics_file = save_calendar(cal, filename)
+                cal = create_calendar(meal_plan, compress=compress)
+                if compress:
+                    stats = compression_stats(create_calendar(meal_plan), cal)
+                    st.caption(f"{stats['events_before']} events combined into {stats['events_after']}, "
+                               f"file {stats['size_reduction_pct']}% smaller")
+                if shard_period:
+                    shard_files, _ = save_calendar_shards(meal_plan, filename, shard_period, compress=compress)
+                    zip_name = f"{os.path.splitext(os.path.basename(filename))[0]}.zip"
+                    ics_file = save_zip_bundle(shard_files, os.path.join("cal_invites", zip_name))
+                    label, mime = "Download Calendar Files (.zip)", "application/zip"
+                else:
+                    ics_file = save_calendar(cal, filename)
+                    label, mime = "Download Calendar File (.ics)", "text/calendar"
                 
                 # Provide download link
                 with open(ics_file, "rb") as file:
                     btn = st.download_button(
-                        label="Download Calendar File (.ics)",
+                        label=label,
                         data=file,
                         file_name=os.path.basename(ics_file),
-                        mime="text/calendar"
+                        mime=mime
                     )
                 
                 st.success("Calendar file created successfully!")
@@ -266,16 +297,27 @@ with tab2:
                     # Generate calendar invites
                     if st.button("Generate Calendar Invites"):
                         with st.spinner("Creating calendar events..."):
-                            cal = create_calendar(meal_plan)
-                            ics_file = save_calendar(cal, selected_plan)
+                            cal = create_calendar(meal_plan, compress=compress)
+                            if compress:
+                                stats = compression_stats(create_calendar(meal_plan), cal)
+                                st.caption(f"{stats['events_before']} events combined into {stats['events_after']}, "
+                                           f"file {stats['size_reduction_pct']}% smaller")
+                            if shard_period:
+                                shard_files, _ = save_calendar_shards(meal_plan, selected_plan, shard_period, compress=compress)
+                                zip_name = f"{os.path.splitext(os.path.basename(selected_plan))[0]}.zip"
+                                ics_file = save_zip_bundle(shard_files, os.path.join("cal_invites", zip_name))
+                                label, mime = "Download Calendar Files (.zip)", "application/zip"
+                            else:
+                                ics_file = save_calendar(cal, selected_plan)
+                                label, mime = "Download Calendar File (.ics)", "text/calendar"
                             
                             # Provide download link
                             with open(ics_file, "rb") as file:
                                 btn = st.download_button(
-                                    label="Download Calendar File (.ics)",
+                                    label=label,
                                     data=file,
                                     file_name=os.path.basename(ics_file),
-                                    mime="text/calendar"
+                                    mime=mime
                                 )
                             
                             st.success("Calendar file created successfully!")
@@ -0,0 +1,312 @@
+# Imports
+import os
+import sys
+import json
+import copy
+import re
+import base64
+import hashlib
+import argparse
+import queue
+import http.client
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit, quote
+from concurrent.futures import ThreadPoolExecutor
+from icalendar import Calendar
+from calendar_invite import load_meal_plan, create_calendar
+
+CALDAV_STATE_FILE = os.path.join("caldav_state", "caldav_state.json")
+
+class ConnectionPool:
+    """
+    Fixed-size pool of persistent HTTP(S) connections to one CalDAV server.
+    """
+    def __init__(self, base_url, size=4, username=None, password=None, timeout=30):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.headers = {}
+        if username is not None:
+            token = base64.b64encode(f"{username}:{password or ''}".encode('utf-8')).decode('ascii')
+            self.headers['Authorization'] = f"Basic {token}"
+
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(self._connect())
+
+    def _connect(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request on a pooled connection, reconnecting once if the
+        server closed it.
+
+        Returns:
+            Tuple of (status, response headers, response body)
+        """
+        all_headers = dict(self.headers)
+        all_headers.update(headers or {})
+
+        conn = self.connections.get()
+        try:
+            for attempt in range(2):
+                try:
+                    conn.request(method, path, body=body, headers=all_headers)
+                    response = conn.getresponse()
+                    return response.status, response.headers, response.read()
+                except (http.client.HTTPException, ConnectionError):
+                    conn.close()
+                    conn = self._connect()
+                    if attempt:
+                        raise
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get().close()
+
+def load_sync_state(state_path=CALDAV_STATE_FILE):
+    """
+    Load the ETags and content hashes recorded by previous syncs.
+
+    Args:
+        state_path: Path to the state JSON file
+
+    Returns:
+        Dictionary mapping calendar URL -> {resource name: {'etag', 'hash'}}
+    """
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading CalDAV sync state, starting fresh: {e}")
+        return {}
+
+def save_sync_state(state, state_path=CALDAV_STATE_FILE):
+    """
+    Save the sync state to disk.
+
+    Args:
+        state: Dictionary as returned by load_sync_state
+        state_path: Path to the state JSON file
+
+    Returns:
+        Path to the saved state file
+    """
+    state_dir = os.path.dirname(state_path)
+    if state_dir and not os.path.exists(state_dir):
+        os.makedirs(state_dir)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, state_path)
+    return state_path
+
+def calendar_resources(cal):
+    """
+    Split a calendar into one single-event calendar object per VEVENT.
+
+    Args:
+        cal: icalendar.Calendar object, e.g. from create_calendar
+
+    Returns:
+        Dictionary mapping resource name -> (ics bytes, content hash). The hash
+        ignores DTSTAMP so regenerating an unchanged plan is not an update.
+    """
+    resources = {}
+    for event in cal.walk('VEVENT'):
+        uid = str(event.get('uid'))
+        name = f"{re.sub(r'[^A-Za-z0-9._-]', '_', uid)}.ics"
+        # Meals sharing a start time share a UID, keep every one of them
+        if name in resources:
+            suffix = 2
+            while f"{name[:-4]}-{suffix}.ics" in resources:
+                suffix += 1
+            uid = f"{uid}-{suffix}"
+            name = f"{name[:-4]}-{suffix}.ics"
+            # Rename a copy, the caller's calendar is left as it was
+            event = copy.deepcopy(event)
+            event['uid'] = uid
+
+        wrapper = Calendar()
+        wrapper.add('prodid', cal.get('prodid'))
+        wrapper.add('version', '2.0')
+        wrapper.add_component(event)
+        body = wrapper.to_ical()
+
+        stable = b"\n".join(line for line in body.splitlines() if not line.startswith(b"DTSTAMP"))
+        resources[name] = (body, hashlib.sha256(stable).hexdigest())
+    return resources
+
+def ensure_calendar(pool, calendar_path):
+    """
+    Create the calendar collection if it does not exist yet.
+
+    Returns:
+        True if the collection exists or was created
+    """
+    status, _, _ = pool.request('MKCALENDAR', calendar_path)
+    # 405 means the collection already exists
+    return status in (200, 201, 405)
+
+GETETAG_PROPFIND = (b'<?xml version="1.0" encoding="utf-8"?>'
+                    b'<d:propfind xmlns:d="DAV:"><d:prop><d:getetag/></d:prop></d:propfind>')
+
+def fetch_etag(pool, path):
+    """
+    Look up the current ETag of a resource, for servers that don't return
+    one from PUT.
+
+    Tries HEAD first, then a PROPFIND for DAV:getetag.
+
+    Returns:
+        The ETag, or None if the server does not report one
+    """
+    status, headers, _ = pool.request('HEAD', path)
+    if status == 200 and headers.get('ETag'):
+        return headers.get('ETag')
+
+    status, _, body = pool.request('PROPFIND', path, body=GETETAG_PROPFIND,
+                                   headers={'Depth': '0', 'Content-Type': 'application/xml; charset=utf-8'})
+    if status != 207:
+        return None
+    try:
+        etag = ET.fromstring(body).find('.//{DAV:}getetag')
+    except ET.ParseError:
+        return None
+    return etag.text.strip() if etag is not None and etag.text else None
+
+def _put_event(pool, path, body, etag, exists):
+    headers = {'Content-Type': 'text/calendar; charset=utf-8'}
+    if etag:
+        headers['If-Match'] = etag
+    elif not exists:
+        headers['If-None-Match'] = '*'
+    # An existing event without a known ETag is replaced unconditionally
+    status, response_headers, _ = pool.request('PUT', path, body=body, headers=headers)
+    etag = response_headers.get('ETag')
+    if status in (200, 201, 204) and not etag:
+        etag = fetch_etag(pool, path)
+    return status, etag
+
+def _delete_event(pool, path, etag):
+    headers = {'If-Match': etag} if etag else {}
+    status, _, _ = pool.request('DELETE', path, headers=headers)
+    return status, None
+
+def sync_calendar(cal, calendar_url, username=None, password=None, max_workers=4,
+                  state_path=CALDAV_STATE_FILE, create=False):
+    """
+    Push a calendar to a CalDAV collection, uploading only changed events.
+
+    New events are created with If-None-Match: *, changed ones replaced with
+    If-Match on the recorded ETag (unconditionally if the server never gave
+    one), and events no longer in the calendar are deleted. Events edited
+    on the server since the last sync are reported as conflicts and left
+    alone.
+
+    Args:
+        cal: icalendar.Calendar object, e.g. from create_calendar
+        calendar_url: URL of the CalDAV calendar collection
+        username: Optional username for basic authentication
+        password: Optional password for basic authentication
+        max_workers: Number of pooled connections and concurrent requests
+        state_path: Path to the ETag state file
+        create: If True, create the collection with MKCALENDAR when missing
+
+    Returns:
+        Dictionary with created, updated, deleted, unchanged, conflicts and errors
+    """
+    if not calendar_url.endswith('/'):
+        calendar_url += '/'
+    calendar_path = urlsplit(calendar_url).path
+
+    state = load_sync_state(state_path)
+    known = state.setdefault(calendar_url, {})
+    resources = calendar_resources(cal)
+
+    summary = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0,
+               "conflicts": [], "errors": []}
+
+    pool = ConnectionPool(calendar_url, size=max_workers, username=username, password=password)
+    try:
+        if create and not ensure_calendar(pool, calendar_path):
+            summary["errors"].append(calendar_path)
+            return summary
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for name, (body, content_hash) in resources.items():
+                previous = known.get(name)
+                if previous and previous.get("hash") == content_hash:
+                    summary["unchanged"] += 1
+                    continue
+                etag = previous.get("etag") if previous else None
+                future = executor.submit(_put_event, pool, calendar_path + quote(name), body, etag,
+                                         previous is not None)
+                futures[future] = ('put', name, content_hash, previous is not None)
+
+            for name in [n for n in known if n not in resources]:
+                future = executor.submit(_delete_event, pool, calendar_path + quote(name),
+                                         known[name].get("etag"))
+                futures[future] = ('delete', name, None, True)
+
+            for future, (action, name, content_hash, existed) in futures.items():
+                try:
+                    status, etag = future.result()
+                except Exception as e:
+                    print(f"Error syncing {name}: {e}")
+                    summary["errors"].append(name)
+                    continue
+
+                if status == 412:
+                    summary["conflicts"].append(name)
+                elif action == 'put' and status in (200, 201, 204):
+                    known[name] = {"etag": etag, "hash": content_hash}
+                    summary["updated" if existed else "created"] += 1
+                elif action == 'delete' and status in (200, 204, 404):
+                    known.pop(name, None)
+                    summary["deleted"] += 1
+                else:
+                    print(f"Unexpected status {status} for {action.upper()} {name}")
+                    summary["errors"].append(name)
+    finally:
+        pool.close()
+        save_sync_state(state, state_path)
+
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Push a meal plan to a CalDAV calendar")
+    parser.add_argument("meal_plan", help="Path to the meal plan JSON file")
+    parser.add_argument("calendar_url", help="URL of the CalDAV calendar collection")
+    parser.add_argument("--user", help="Username for basic authentication")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default 4)")
+    parser.add_argument("--compress", action="store_true", help="Merge repeating meals into recurring events")
+    parser.add_argument("--create", action="store_true", help="Create the calendar if it does not exist")
+    args = parser.parse_args()
+
+    meal_plan = load_meal_plan(args.meal_plan)
+    if not meal_plan:
+        sys.exit(1)
+
+    cal = create_calendar(meal_plan, compress=args.compress)
+    summary = sync_calendar(cal, args.calendar_url, username=args.user,
+                            password=os.environ.get("CALDAV_PASSWORD"),
+                            max_workers=args.workers, create=args.create)
+
+    print(f"Created {summary['created']}, updated {summary['updated']}, "
+          f"deleted {summary['deleted']}, unchanged {summary['unchanged']}")
+    if summary["conflicts"]:
+        print(f"Changed on the server, not overwritten: {', '.join(summary['conflicts'])}")
+    if summary["errors"]:
+        print(f"Failed: {', '.join(summary['errors'])}")
+        sys.exit(1)
@@ -2,6 +2,8 @@
 import os
 import json
 import sys
+import hashlib
+import zipfile
 from datetime import datetime, timedelta
 import re
 from icalendar import Calendar, Event
@@ -114,13 +116,14 @@ def parse_time_from_meal(meal_text):
     else:
         return None
 
-def create_calendar_event(date, meal_data):
+def create_calendar_event(date, meal_data, dtstamp=None):
     """
     Create a calendar event for a meal.
     
     Args:
         date: datetime object for the date of the meal
         meal_data: Dictionary containing meal text and recipe links
+        dtstamp: Optional DTSTAMP datetime, defaults to now
         
     Returns:
         icalendar.Event object
@@ -156,18 +159,91 @@ def create_calendar_event(date, meal_data):
     event.add('summary', meal_text)
     event.add('dtstart', event_time)
     event.add('dtend', event_time + timedelta(minutes=30))  # Default 30-minute duration
-    event.add('dtstamp', datetime.now())
+    event.add('dtstamp', dtstamp or datetime.now())
     event['uid'] = f"{event_time.strftime('%Y%m%dT%H%M%S')}@senproscrape.meal"
     event.add('description', description)
     
     return event
 
-def create_calendar(meal_plan):
+def find_repeating_meals(meal_plan, max_gap_days=1):
+    """
+    Group identical meals (same text, time and recipes) into runs of
+    nearby dates.
+    
+    A run covers one copy of a meal per date; further copies of the same
+    meal on a date are returned as single-date runs so none are lost.
+    
+    Args:
+        meal_plan: Dictionary containing the meal plan data
+        max_gap_days: Most days a meal may be missing from a run before a new run starts
+        
+    Returns:
+        List of (dates, meal_data) tuples ordered by first date, dates sorted ascending
+    """
+    occurrences = {}
+    meals_by_key = {}
+    for date_id, meals in meal_plan.items():
+        date = parse_date_from_id(date_id)
+        for meal_data in meals:
+            key = json.dumps(meal_data, sort_keys=True)
+            counts = occurrences.setdefault(key, {})
+            counts[date] = counts.get(date, 0) + 1
+            meals_by_key.setdefault(key, meal_data)
+
+    runs = []
+    for key, counts in occurrences.items():
+        for date, count in counts.items():
+            runs.extend(([date], meals_by_key[key]) for _ in range(count - 1))
+
+        dates = sorted(counts)
+        run = [dates[0]]
+        for date in dates[1:]:
+            if (date - run[-1]).days - 1 > max_gap_days:
+                runs.append((run, meals_by_key[key]))
+                run = []
+            run.append(date)
+        runs.append((run, meals_by_key[key]))
+
+    runs.sort(key=lambda x: x[0][0])
+    return runs
+
+def create_recurring_event(dates, meal_data, dtstamp=None):
+    """
+    Create a single daily recurring event covering a run of dates.
+    
+    Args:
+        dates: Sorted list of datetime objects the meal occurs on
+        meal_data: Dictionary containing meal text and recipe links
+        dtstamp: Optional DTSTAMP datetime, defaults to now
+        
+    Returns:
+        icalendar.Event object with an RRULE, and EXDATEs for missing days
+    """
+    event = create_calendar_event(dates[0], meal_data, dtstamp)
+    if len(dates) == 1:
+        return event
+
+    event_time = event.decoded('dtstart')
+    span_days = (dates[-1] - dates[0]).days + 1
+    event.add('rrule', {'freq': 'daily', 'count': span_days})
+
+    present = set(dates)
+    skipped = [event_time + timedelta(days=i) for i in range(span_days)
+               if dates[0] + timedelta(days=i) not in present]
+    if skipped:
+        event.add('exdate', skipped)
+
+    return event
+
+def create_calendar(meal_plan, compress=False, dtstamp=None):
     """
     Create a calendar with events for all meals in the meal plan.
     
     Args:
         meal_plan: Dictionary containing the meal plan data
+        compress: If True, emit meals repeated on consecutive days as one recurring event
+        dtstamp: Optional DTSTAMP datetime for every event, defaults to now.
+                 Pass a fixed value to get the same bytes for the same plan.
         
     Returns:
         icalendar.Calendar object
@@ -175,6 +251,17 @@ def create_calendar(meal_plan):
     cal = Calendar()
     cal.add('prodid', '-//SenPro Meal Scraper//senproscrape.meal//')
     cal.add('version', '2.0')
+
+    if compress:
+        for dates, meal_data in find_repeating_meals(meal_plan):
+            cal.add_component(create_recurring_event(dates, meal_data, dtstamp))
+        # Every meal must still occur exactly once
+        meal_count = sum(len(meals) for meals in meal_plan.values())
+        occurrences = count_occurrences(cal)
+        if occurrences != meal_count:
+            raise ValueError(f"Compressed calendar has {occurrences} occurrences, "
+                             f"meal plan has {meal_count} meals")
+        return cal
     
     # Process each date in the meal plan
     for date_id, meals in meal_plan.items():
@@ -182,11 +269,66 @@ def create_calendar(meal_plan):
         
         # Process each meal for this date
         for meal_text in meals:
-            event = create_calendar_event(date, meal_text)
+            event = create_calendar_event(date, meal_text, dtstamp)
             cal.add_component(event)
     
     return cal
 
+def count_occurrences(cal):
+    """
+    Count event occurrences in a calendar, expanding the daily RRULEs and
+    EXDATEs that create_recurring_event writes.
+    
+    Args:
+        cal: icalendar.Calendar object
+        
+    Returns:
+        Number of occurrences
+    """
+    total = 0
+    for event in cal.walk('VEVENT'):
+        rrule = event.get('rrule')
+        count = rrule.get('COUNT', 1) if rrule else 1
+        # Parsed calendars hold each RRULE part as a list
+        if isinstance(count, list):
+            count = count[0]
+        exdates = event.get('exdate', [])
+        if not isinstance(exdates, list):
+            exdates = [exdates]
+        total += count - sum(len(exdate.dts) for exdate in exdates)
+    return total
+
+def compression_stats(plain_cal, compressed_cal):
+    """
+    Compare event counts and serialized sizes of two calendars.
+    
+    Args:
+        plain_cal: Calendar created with compress=False
+        compressed_cal: Calendar created with compress=True
+        
+    Returns:
+        Dictionary with event and occurrence counts, sizes in bytes and
+        percentage reductions
+    """
+    plain_events = len(plain_cal.walk('VEVENT'))
+    compressed_events = len(compressed_cal.walk('VEVENT'))
+    plain_size = len(plain_cal.to_ical())
+    compressed_size = len(compressed_cal.to_ical())
+
+    def reduction(before, after):
+        return round(100 * (before - after) / before, 1) if before else 0.0
+
+    return {
+        "events_before": plain_events,
+        "events_after": compressed_events,
+        "event_reduction_pct": reduction(plain_events, compressed_events),
+        "occurrences_before": count_occurrences(plain_cal),
+        "occurrences_after": count_occurrences(compressed_cal),
+        "bytes_before": plain_size,
+        "bytes_after": compressed_size,
+        "size_reduction_pct": reduction(plain_size, compressed_size),
+    }
+
 def save_calendar(cal, base_filename):
     """
     Save the calendar to an .ics file in the cal_invites directory.
@@ -214,7 +356,180 @@ def save_calendar(cal, base_filename):
     print(f"Calendar invite saved to {filename}")
     return filename
 
+## Sharded output: one .ics file per month or week
+SHARD_PERIODS = ('month', 'week')
+
+def shard_key(date, period='month'):
+    """
+    Name of the shard a date belongs to.
+    
+    Args:
+        date: datetime object
+        period: 'month' or 'week'
+        
+    Returns:
+        Shard name, e.g. '2025-05' or '2025-W22'
+    """
+    if period == 'week':
+        year, week, _ = date.isocalendar()
+        return f"{year}-W{week:02d}"
+    return date.strftime('%Y-%m')
+
+def shard_meal_plan(meal_plan, period='month'):
+    """
+    Split a meal plan into smaller meal plans by month or week.
+    
+    Args:
+        meal_plan: Dictionary containing the meal plan data
+        period: 'month' or 'week'
+        
+    Returns:
+        Dictionary mapping shard name to a meal plan with that shard's dates
+    """
+    if period not in SHARD_PERIODS:
+        raise ValueError(f"Unsupported shard period '{period}', expected one of {', '.join(SHARD_PERIODS)}")
+    shards = {}
+    for date_id, meals in meal_plan.items():
+        key = shard_key(parse_date_from_id(date_id), period)
+        shards.setdefault(key, {})[date_id] = meals
+    return dict(sorted(shards.items()))
+
+def save_calendar_shards(meal_plan, base_filename, period='month', compress=False, cal_dir="cal_invites"):
+    """
+    Save one .ics file per shard in <cal_dir>/<base name>/<period>/,
+    regenerating only shards whose meals changed since the last save.
+    
+    Each period keeps its own directory and manifest, keyed by shard file
+    name, so the same shards can be written from any working directory.
+    
+    Args:
+        meal_plan: Dictionary containing the meal plan data
+        base_filename: Base filename to use for the shard directory and files
+        period: 'month' or 'week'
+        compress: If True, merge repeating meals into recurring events
+        cal_dir: Directory the shard directory is created in
+        
+    Returns:
+        Tuple of (paths of all shard files, names of the shards regenerated)
+    """
+    base_name = os.path.splitext(os.path.basename(base_filename))[0]
+    shard_dir = os.path.join(cal_dir, base_name, period)
+    if not os.path.exists(shard_dir):
+        os.makedirs(shard_dir)
+        print(f"Created directory: {shard_dir}")
+
+    manifest_path = os.path.join(shard_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    new_manifest = {}
+    paths = []
+    regenerated = []
+    for key, shard_plan in shard_meal_plan(meal_plan, period).items():
+        shard_name = f"{base_name}_{key}.ics"
+        filename = os.path.join(shard_dir, shard_name)
+        content_hash = hashlib.sha256(
+            json.dumps([shard_plan, compress], sort_keys=True).encode('utf-8')).hexdigest()
+
+        if manifest.get(shard_name) != content_hash or not os.path.exists(filename):
+            with open(filename, 'wb') as f:
+                f.write(create_calendar(shard_plan, compress=compress).to_ical())
+            regenerated.append(key)
+
+        new_manifest[shard_name] = content_hash
+        paths.append(filename)
+
+    # Remove shards whose dates are no longer in the meal plan
+    for shard_name in manifest:
+        filename = os.path.join(shard_dir, os.path.basename(shard_name))
+        if shard_name not in new_manifest and os.path.exists(filename):
+            os.remove(filename)
+
+    with open(manifest_path, 'w') as f:
+        json.dump(new_manifest, f, indent=4)
+
+    print(f"Calendar shards saved to {shard_dir} ({len(regenerated)} of {len(paths)} regenerated)")
+    return paths, regenerated
+
+class _ChunkBuffer:
+    """
+    Write-only, non-seekable sink that zipfile writes into and
+    iter_zip_bundle drains after every chunk.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_zip_bundle(paths, chunk_size=64 * 1024):
+    """
+    Stream a zip archive of files without building it in memory.
+    
+    Args:
+        paths: Paths of the files to include, stored under their base names
+        chunk_size: Bytes read from each file at a time
+        
+    Yields:
+        Successive chunks of the zip archive as bytes
+    """
+    sink = _ChunkBuffer()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+        for path in paths:
+            info = zipfile.ZipInfo.from_file(path, os.path.basename(path))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, 'rb') as src, bundle.open(info, 'w') as dest:
+                while True:
+                    data = src.read(chunk_size)
+                    if not data:
+                        break
+                    dest.write(data)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()
+
+def save_zip_bundle(paths, zip_filename):
+    """
+    Write the zip bundle of shard files to disk chunk by chunk.
+    
+    Args:
+        paths: Paths of the shard files
+        zip_filename: Path of the zip file to write
+        
+    Returns:
+        Path to the saved zip file
+    """
+    with open(zip_filename, 'wb') as f:
+        for chunk in iter_zip_bundle(paths):
+            f.write(chunk)
+    print(f"Calendar bundle saved to {zip_filename}")
+    return zip_filename
+
 if __name__ == "__main__":
+    # Check --shard month|week before asking for a meal plan
+    period = None
+    if '--shard' in sys.argv:
+        shard_index = sys.argv.index('--shard') + 1
+        period = sys.argv[shard_index].lower() if shard_index < len(sys.argv) else None
+        if period not in SHARD_PERIODS:
+            print(f"--shard must be one of {', '.join(SHARD_PERIODS)}")
+            sys.exit(1)
+
     # Ask which mealplan to read in
     meal_plan_path = select_meal_plan()
     if not meal_plan_path:
@@ -226,8 +541,20 @@ if __name__ == "__main__":
     if not meal_plan:
         sys.exit(1)
     
-    # Parse into an ical calendar invite
-    cal = create_calendar(meal_plan)
+    # Parse into an ical calendar invite, optionally merging repeated meals
+    compress = '--compress' in sys.argv
+    cal = create_calendar(meal_plan, compress=compress)
+    if compress:
+        stats = compression_stats(create_calendar(meal_plan), cal)
+        print(f"Events: {stats['events_before']} -> {stats['events_after']} "
+              f"({stats['event_reduction_pct']}% fewer)")
+        print(f"Size: {stats['bytes_before']} -> {stats['bytes_after']} bytes "
+              f"({stats['size_reduction_pct']}% smaller)")
     
-    # Save into the cal invites dir
-    save_calendar(cal, meal_plan_path)
+    # Save into the cal invites dir, optionally split by --shard month|week
+    if period:
+        paths, _ = save_calendar_shards(meal_plan, meal_plan_path, period, compress=compress)
+        base_name = os.path.splitext(os.path.basename(meal_plan_path))[0]
+        save_zip_bundle(paths, os.path.join("cal_invites", f"{base_name}.zip"))
+    else:
+        save_calendar(cal, meal_plan_path)
@@ -0,0 +1,242 @@
+# Imports
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+from bs4 import BeautifulSoup, FeatureNotFound
+from html_scrape import (get_dates, select_meals, iter_meal_plan, select_meals_incremental)
+from synthetic_planner import generate_planner_html
+
+PARSERS = ('html.parser', 'lxml', 'html5lib')
+
+## Extraction engines
+# Each engine takes the HTML and a BeautifulSoup parser name and returns the
+# meal plan. 'reference' is the original get_dates + select_meals path that
+# every other engine and parser must reproduce byte for byte.
+def reference_engine(html_content, parser):
+    soup = BeautifulSoup(html_content, parser)
+    # get_dates prints every date card
+    with contextlib.redirect_stdout(io.StringIO()):
+        dates = get_dates(soup) or []
+        meal_plan = {}
+        for curr_date in dates:
+            meals = select_meals(soup, curr_date)
+            if meals:
+                meal_plan[curr_date] = meals
+    return meal_plan
+
+def card_walk_engine(html_content, parser):
+    return dict(iter_meal_plan(BeautifulSoup(html_content, parser)))
+
+def incremental_cold_engine(html_content, parser):
+    cache = {"cards": {}, "dates": {}}
+    meal_plan, _, _ = select_meals_incremental(BeautifulSoup(html_content, parser), cache)
+    return meal_plan
+
+def incremental_warm_engine(html_content, parser):
+    # Second pass served entirely from the cache, round-tripped through JSON
+    # the way load_card_cache would read it back
+    cache = {"cards": {}, "dates": {}}
+    select_meals_incremental(BeautifulSoup(html_content, parser), cache)
+    cache = json.loads(json.dumps(cache))
+    meal_plan, _, _ = select_meals_incremental(BeautifulSoup(html_content, parser), cache)
+    return meal_plan
+
+ENGINES = {
+    'reference': reference_engine,
+    'card_walk': card_walk_engine,
+    'incremental_cold': incremental_cold_engine,
+    'incremental_warm': incremental_warm_engine,
+}
+
+def available_parsers():
+    """
+    BeautifulSoup parser backends installed here, html.parser always first.
+    """
+    parsers = []
+    for parser in PARSERS:
+        try:
+            BeautifulSoup("<p></p>", parser)
+            parsers.append(parser)
+        except FeatureNotFound:
+            continue
+    return parsers
+
+def canonical_output(meal_plan):
+    """
+    Serialize a meal plan exactly as save_to_json would.
+    """
+    return json.dumps(meal_plan, indent=4).encode('utf-8')
+
+def run_engine(engine, html_content, parser):
+    """
+    Run an engine, returning its serialized output or the error it raised.
+    """
+    try:
+        return canonical_output(engine(html_content, parser))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}".encode('utf-8')
+
+## Test case minimisation
+def _page_from_cards(cards_markup):
+    return "<html><body>\n" + "\n".join(cards_markup) + "\n</body></html>"
+
+def _ddmin(items, still_fails):
+    # Delta debugging: drop ever smaller chunks while the failure persists
+    chunks = 2
+    while len(items) >= 2:
+        size = -(-len(items) // chunks)
+        reduced = False
+        for start in range(0, len(items), size):
+            candidate = items[:start] + items[start + size:]
+            if candidate and still_fails(candidate):
+                items = candidate
+                chunks = max(chunks - 1, 2)
+                reduced = True
+                break
+        if not reduced:
+            if chunks >= len(items):
+                break
+            chunks = min(chunks * 2, len(items))
+    return items
+
+def minimise_page(html_content, fails):
+    """
+    Shrink a failing page while it keeps failing.
+
+    First whole date cards are removed with delta debugging, then single
+    elements inside the remaining cards are removed one at a time.
+
+    Args:
+        html_content: HTML of the failing page
+        fails: Function taking HTML and returning True if it still fails
+
+    Returns:
+        Minimised HTML
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    cards = [str(card) for card in soup.select("div.date_cards.d-flex.flex-column")]
+    if cards and fails(_page_from_cards(cards)):
+        cards = _ddmin(cards, lambda subset: fails(_page_from_cards(subset)))
+        html_content = _page_from_cards(cards)
+
+    changed = True
+    while changed:
+        changed = False
+        soup = BeautifulSoup(html_content, 'html.parser')
+        for i in range(len(soup.find_all(True))):
+            candidate_soup = BeautifulSoup(html_content, 'html.parser')
+            tag = candidate_soup.find_all(True)[i]
+            if tag.name in ('html', 'body'):
+                continue
+            tag.decompose()
+            candidate = str(candidate_soup)
+            if fails(candidate):
+                html_content = candidate
+                changed = True
+                break
+    return html_content
+
+## Corpus
+def build_corpus(corpus_dir=None, generated=50, days=14, seed=0):
+    """
+    Collect real pages from a directory and generate synthetic ones.
+
+    Half of the generated pages include edge-case markup.
+
+    Returns:
+        List of (name, html_content) tuples
+    """
+    corpus = []
+    if corpus_dir:
+        for filename in sorted(os.listdir(corpus_dir)):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(corpus_dir, filename), 'r', encoding='utf-8') as f:
+                    corpus.append((filename, f.read()))
+    for i in range(generated):
+        edge_cases = i % 2 == 1
+        html_content = generate_planner_html(days=days, seed=seed + i, edge_cases=edge_cases)
+        corpus.append((f"generated_{i:03d}{'_edge' if edge_cases else ''}.html", html_content))
+    return corpus
+
+def run_harness(corpus, engines=ENGINES, parsers=None, failures_dir="diff_failures", minimise=True):
+    """
+    Run every engine with every parser over the corpus and compare each
+    output byte for byte with the reference engine on html.parser.
+
+    Args:
+        corpus: List of (name, html_content) tuples
+        engines: Dictionary of engine name -> function
+        parsers: Parser backends to use, defaults to all installed ones
+        failures_dir: Directory where minimised failing pages are written
+        minimise: If True, minimise each failing page
+
+    Returns:
+        Dictionary mapping (engine, parser) to {'seconds', 'pages', 'failures'}
+    """
+    parsers = parsers or available_parsers()
+    results = {(engine, parser): {"seconds": 0.0, "pages": 0, "failures": []}
+               for engine in engines for parser in parsers}
+
+    for name, html_content in corpus:
+        expected = run_engine(reference_engine, html_content, 'html.parser')
+        for engine_name, engine in engines.items():
+            for parser in parsers:
+                start = time.perf_counter()
+                output = run_engine(engine, html_content, parser)
+                result = results[(engine_name, parser)]
+                result["seconds"] += time.perf_counter() - start
+                result["pages"] += 1
+                if output == expected:
+                    continue
+
+                failure = {"page": name}
+                if minimise:
+                    def fails(candidate):
+                        return (run_engine(engine, candidate, parser)
+                                != run_engine(reference_engine, candidate, 'html.parser'))
+                    minimal = minimise_page(html_content, fails)
+                    if not os.path.exists(failures_dir):
+                        os.makedirs(failures_dir)
+                    path = os.path.join(failures_dir,
+                                        f"{engine_name}_{parser}_{os.path.splitext(name)[0]}.html")
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(minimal)
+                    failure["minimised"] = path
+                result["failures"].append(failure)
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check extraction engines and parsers against the reference output")
+    parser.add_argument("--corpus", help="Directory of real planner HTML pages")
+    parser.add_argument("--generated", type=int, default=50, help="Number of synthetic pages")
+    parser.add_argument("--days", type=int, default=14, help="Date cards per synthetic page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), help="Engines to run (default all)")
+    parser.add_argument("--parsers", nargs="+", choices=PARSERS, help="Parsers to use (default all installed)")
+    parser.add_argument("--failures-dir", default="diff_failures")
+    parser.add_argument("--no-minimise", action="store_true", help="Don't minimise failing pages")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus, args.generated, args.days, args.seed)
+    engines = {name: ENGINES[name] for name in (args.engines or ENGINES)}
+    results = run_harness(corpus, engines, args.parsers, args.failures_dir, not args.no_minimise)
+
+    print(f"{len(corpus)} pages\n")
+    print(f"{'engine':<20}{'parser':<14}{'ms/page':>10}{'failures':>10}")
+    total_failures = 0
+    for (engine_name, parser_name), result in results.items():
+        ms_per_page = 1000 * result["seconds"] / max(result["pages"], 1)
+        print(f"{engine_name:<20}{parser_name:<14}{ms_per_page:>10.2f}{len(result['failures']):>10}")
+        total_failures += len(result["failures"])
+
+    for (engine_name, parser_name), result in results.items():
+        for failure in result["failures"]:
+            print(f"FAIL {engine_name}/{parser_name}: {failure['page']}"
+                  + (f" -> {failure['minimised']}" if 'minimised' in failure else ""))
+
+    sys.exit(1 if total_failures else 0)
@@ -0,0 +1,150 @@
+# Imports
+import os
+import csv
+import json
+import re
+from datetime import datetime
+
+# Size of each buffered write to disk
+CHUNK_SIZE = 1024 * 1024
+
+EXPORT_FORMATS = ('csv', 'tsv', 'jsonl', 'json')
+
+class AtomicChunkedFile:
+    """
+    Text file that is written through a large buffer to a temporary file and
+    renamed over the target path only once writing has succeeded.
+    """
+    def __init__(self, filename, chunk_size=CHUNK_SIZE, newline=None):
+        self.filename = filename
+        self.tmp_filename = f"{filename}.tmp{os.getpid()}"
+        self.chunk_size = chunk_size
+        self.newline = newline
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.tmp_filename, 'w', encoding='utf-8',
+                         newline=self.newline, buffering=self.chunk_size)
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.tmp_filename, self.filename)
+        else:
+            os.remove(self.tmp_filename)
+        return False
+
+def split_meal_text(meal_text):
+    """
+    Split a meal text into its leading time and the rest of the text.
+
+    Args:
+        meal_text: Text describing the meal, e.g. '08:00 Breakfast Porridge'
+
+    Returns:
+        Tuple of (time, title), time is '' if the text has no leading time
+    """
+    match = re.match(r'(\d{1,2}:\d{2})\s*(.*)', meal_text, re.DOTALL)
+    if match:
+        return match.group(1), match.group(2)
+    return '', meal_text
+
+def iter_meal_records(items):
+    """
+    Flatten (date_id, meals) pairs into one record per meal.
+
+    Args:
+        items: Iterable of (date_id, meals) pairs, e.g. meal_plan.items()
+               or html_scrape.iter_meal_plan(soup)
+
+    Yields:
+        Dictionaries with date, time, title and recipe_links keys
+    """
+    for date_id, meals in items:
+        for meal in meals:
+            # Handle both formats (string or dict) for backward compatibility
+            if isinstance(meal, str):
+                meal_text = meal
+                recipe_links = {}
+            else:
+                meal_text = meal.get("text", "")
+                recipe_links = meal.get("recipe_links", {})
+
+            time_str, title = split_meal_text(meal_text)
+            yield {
+                "date": date_id,
+                "time": time_str,
+                "title": title,
+                "recipe_links": recipe_links,
+            }
+
+def _write_delimited(items, f, delimiter):
+    writer = csv.writer(f, delimiter=delimiter)
+    writer.writerow(['Date', 'Time', 'Title', 'Recipes'])
+    for record in iter_meal_records(items):
+        recipes = '; '.join(f"{name} ({url})" for name, url in record["recipe_links"].items())
+        writer.writerow([record["date"], record["time"], record["title"], recipes])
+
+def _write_jsonl(items, f):
+    for record in iter_meal_records(items):
+        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        f.write('\n')
+
+def _write_json(items, f):
+    # Written date by date so the whole plan never has to be serialized at once,
+    # the result is the same {date_id: meals} structure load_meal_plan reads
+    f.write('{')
+    for i, (date_id, meals) in enumerate(items):
+        if i:
+            f.write(',')
+        f.write(json.dumps(date_id, ensure_ascii=False))
+        f.write(':')
+        f.write(json.dumps(meals, ensure_ascii=False, separators=(',', ':')))
+    f.write('}')
+
+def export_meal_plan(items, filename=None, fmt=None):
+    """
+    Stream a meal plan to a CSV, TSV, JSONL or compact JSON file.
+
+    Records are written as they are produced, so a generator such as
+    html_scrape.iter_meal_plan(soup) is exported while it is being extracted.
+
+    Args:
+        items: Iterable of (date_id, meals) pairs
+        filename: Optional filename, will generate a timestamped one if not provided
+        fmt: One of EXPORT_FORMATS, taken from the filename extension if not provided
+
+    Returns:
+        The filename where data was saved
+    """
+    if fmt is None:
+        fmt = os.path.splitext(filename)[1].lstrip('.').lower() if filename else 'json'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+    # Create meal_plans directory if it doesn't exist
+    plans_dir = "meal_plans"
+    if not os.path.exists(plans_dir):
+        os.makedirs(plans_dir)
+        print(f"Created directory: {plans_dir}")
+
+    if filename is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(plans_dir, f"meal_plan_{timestamp}.{fmt}")
+    else:
+        # If filename is provided, make sure it's in the meal_plans directory
+        filename = os.path.join(plans_dir, os.path.basename(filename))
+
+    if fmt in ('csv', 'tsv'):
+        with AtomicChunkedFile(filename, newline='') as f:
+            _write_delimited(items, f, ',' if fmt == 'csv' else '\t')
+    elif fmt == 'jsonl':
+        with AtomicChunkedFile(filename) as f:
+            _write_jsonl(items, f)
+    else:
+        with AtomicChunkedFile(filename) as f:
+            _write_json(items, f)
+
+    print(f"Meal plan saved to {filename}")
+    return filename
@@ -1,11 +1,12 @@
 # Import things
 import json
-import csv
+import hashlib
 from datetime import datetime
 import os
 from bs4 import BeautifulSoup
 import re
 import pdb
+from exporters import export_meal_plan, EXPORT_FORMATS
 
 ## Read from local HTML file
 def read_html_file(file_path):
@@ -58,13 +59,25 @@ def select_meals(soup, curr_date):
     if not curr_day:
         print(f"No div found with id {curr_date}")
         return []
+
+    return extract_card_meals(curr_day[0])
+
+def extract_card_meals(date_card):
+    """
+    Extract meals from a single date card element.
+    
+    Args:
+        date_card: BeautifulSoup element for one date card
         
+    Returns:
+        List of meals for the date card, sorted by time
+    """
     # Get meal times
-    curr_times = [x.text.strip() for x in curr_day[0].find_all(
+    curr_times = [x.text.strip() for x in date_card.find_all(
         "div", class_=['date_card_date', 'font-small'])]
         
     # Get meal containers
-    meal_css = curr_day[0].find_all("div", class_=['outline-box', 'pb-0', 'px-2', 'pt-2', 'mb-2', 'date_card_cont'])
+    meal_css = date_card.find_all("div", class_=['outline-box', 'pb-0', 'px-2', 'pt-2', 'mb-2', 'date_card_cont'])
     
     meal_total = []
     meal_time_pairs = []
@@ -125,6 +138,143 @@ def select_meals(soup, curr_date):
     
     return meal_total
 
+## Incremental extraction using per-date-card content hashes
+CARD_CACHE_FILE = os.path.join("card_cache", "card_cache.json")
+
+def hash_date_card(date_card):
+    """
+    Fingerprint the raw markup of a date card.
+    
+    Args:
+        date_card: BeautifulSoup element for one date card
+        
+    Returns:
+        Hex digest of the card's markup
+    """
+    return hashlib.sha256(str(date_card).encode('utf-8')).hexdigest()
+
+def load_card_cache(cache_path=CARD_CACHE_FILE):
+    """
+    Load the card hash cache from disk.
+    
+    Args:
+        cache_path: Path to the cache JSON file
+        
+    Returns:
+        Dictionary with 'cards' (hash -> meals) and 'dates' (date ID -> hash)
+    """
+    empty_cache = {"cards": {}, "dates": {}}
+    if not os.path.exists(cache_path):
+        return empty_cache
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception as e:
+        print(f"Error loading card cache, starting fresh: {e}")
+        return empty_cache
+    cache.setdefault("cards", {})
+    cache.setdefault("dates", {})
+    return cache
+
+def save_card_cache(cache, cache_path=CARD_CACHE_FILE):
+    """
+    Save the card hash cache to disk, dropping cards no current date refers to.
+    
+    Args:
+        cache: Cache dictionary as returned by load_card_cache
+        cache_path: Path to the cache JSON file
+        
+    Returns:
+        Path to the saved cache file
+    """
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    live_hashes = set(cache["dates"].values())
+    cache["cards"] = {h: meals for h, meals in cache["cards"].items() if h in live_hashes}
+
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    return cache_path
+
+def iter_meal_plan(soup, include_empty=False):
+    """
+    Extract meals date card by date card, yielding each date as soon as it
+    has been processed.
+    
+    Args:
+        soup: BeautifulSoup object with the HTML content
+        include_empty: If True, also yield date cards without meals, e.g. to
+                       report progress once per card
+        
+    Yields:
+        Tuples of (date_id, meals) for every date card with meals
+    """
+    for date_card in soup.select("div.date_cards.d-flex.flex-column"):
+        meals = extract_card_meals(date_card)
+        if meals or include_empty:
+            yield date_card['id'], meals
+
+def iter_meals_incremental(soup, cache, changed_dates=None, removed_dates=None):
+    """
+    Extract meals for every date card, re-processing only cards whose
+    markup is not already in the cache.
+    
+    Args:
+        soup: BeautifulSoup object with the HTML content
+        cache: Cache dictionary as returned by load_card_cache, updated in place
+        changed_dates: Optional list that new or changed date IDs are appended to
+        removed_dates: Optional list that date IDs from the previous export
+                       missing from this one are appended to
+        
+    Yields:
+        Tuples of (date_id, meals) for every date card with meals. Once every
+        card has been yielded, dates that are not in this export are dropped
+        from the cache so it only ever holds the current window.
+    """
+    seen_dates = set()
+    for date_card in soup.select("div.date_cards.d-flex.flex-column"):
+        date_id = date_card['id']
+        card_hash = hash_date_card(date_card)
+        seen_dates.add(date_id)
+
+        if cache["dates"].get(date_id) != card_hash and changed_dates is not None:
+            changed_dates.append(date_id)
+        cache["dates"][date_id] = card_hash
+
+        meals = cache["cards"].get(card_hash)
+        if meals is None:
+            meals = extract_card_meals(date_card)
+            cache["cards"][card_hash] = meals
+
+        if meals:
+            yield date_id, meals
+
+    for date_id in [d for d in cache["dates"] if d not in seen_dates]:
+        del cache["dates"][date_id]
+        if removed_dates is not None:
+            removed_dates.append(date_id)
+
+def select_meals_incremental(soup, cache):
+    """
+    Extract meals for every date card, re-processing only changed cards.
+    
+    Args:
+        soup: BeautifulSoup object with the HTML content
+        cache: Cache dictionary as returned by load_card_cache, updated in place
+        
+    Returns:
+        Tuple of (meal_plan, changed_dates, removed_dates) where changed_dates
+        lists the date IDs that are new or differ from the previous export,
+        and removed_dates those that were in the previous export but not
+        this one
+    """
+    changed_dates = []
+    removed_dates = []
+    meal_plan = dict(iter_meals_incremental(soup, cache, changed_dates, removed_dates))
+    return meal_plan, changed_dates, removed_dates
+
 
 def extract_meal_info(date_cards):
     meal_plan = {}
@@ -195,7 +345,7 @@ def save_to_json(data, filename=None):
 
 def save_to_csv(data, filename=None):
     """
-    Save meal plan data to a CSV file.
+    Save meal plan data to a CSV file, one row per meal.
     
     Args:
         data: Dictionary with date->meals mapping
@@ -204,35 +354,7 @@ def save_to_csv(data, filename=None):
     Returns:
         The filename where data was saved
     """
-    # Create meal_plans directory if it doesn't exist
-    plans_dir = "meal_plans"
-    if not os.path.exists(plans_dir):
-        os.makedirs(plans_dir)
-        print(f"Created directory: {plans_dir}")
-    
-    if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(plans_dir, f"meal_plan_{timestamp}.csv")
-    else:
-        # If filename is provided, make sure it's in the meal_plans directory
-        filename = os.path.join(plans_dir, os.path.basename(filename))
-    
-    with open(filename, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Date', 'Meal Details'])
-        
-        # For each date, write all meals
-        for date, meals in data.items():
-            # Flatten the meals list
-            flat_meals = []
-            for meal in meals:
-                flat_meals.extend(meal)
-            
-            # Write one row per date with all meals
-            writer.writerow([date, '; '.join(flat_meals)])
-    
-    print(f"Meal plan saved to {filename}")
-    return filename
+    return export_meal_plan(data.items(), filename, fmt='csv')
 
 ## Debug functions
 def debug_show_elements(soup, selector=None, limit=10, depth=0):
@@ -311,6 +433,15 @@ if __name__ == "__main__":
     else:
         file_path = input("Enter the path to the HTML file: ")
     
+    # Check the optional extra export format, e.g. --format csv
+    export_fmt = None
+    if '--format' in sys.argv:
+        format_index = sys.argv.index('--format') + 1
+        export_fmt = sys.argv[format_index].lower() if format_index < len(sys.argv) else None
+        if export_fmt not in EXPORT_FORMATS:
+            print(f"--format must be one of {', '.join(EXPORT_FORMATS)}")
+            exit(1)
+
     # Read HTML from file
     html_content = read_html_file(file_path)
     if not html_content:
@@ -384,13 +515,34 @@ if __name__ == "__main__":
         print(sorted(list(classes)))
         exit(1)
 
-    # Process all dates and gather meals
+    # Process all dates and gather meals, re-extracting only changed cards
+    card_cache = load_card_cache()
+    changed_dates = []
+    removed_dates = []
     meal_plan = {}
-    for curr_date in dates:
-        print(f"Processing date: {curr_date}")
-        meals = select_meals(planner_section, curr_date)
-        if meals:
-            meal_plan[curr_date] = meals
+
+    def collect_meals(items):
+        for date_id, meals in items:
+            meal_plan[date_id] = meals
+            yield date_id, meals
+
+    extracted = collect_meals(iter_meals_incremental(planner_section, card_cache, changed_dates, removed_dates))
+    if export_fmt:
+        # The extra export is written while the cards are being extracted. A
+        # compact JSON export gets its own name so the indented plan saved
+        # below doesn't overwrite it
+        export_name = f'{dates[0]}_compact.json' if export_fmt == 'json' else f'{dates[0]}.{export_fmt}'
+        export_meal_plan(extracted, export_name, fmt=export_fmt)
+    else:
+        for _ in extracted:
+            pass
+    save_card_cache(card_cache)
+    if changed_dates:
+        print(f"Changed dates ({len(changed_dates)}/{len(dates)}): {', '.join(changed_dates)}")
+    if removed_dates:
+        print(f"Removed dates ({len(removed_dates)}): {', '.join(removed_dates)}")
+    if not changed_dates and not removed_dates:
+        print("No dates changed since the previous export")
 
     filename = f'{list(meal_plan.keys())[0]}.json'
     
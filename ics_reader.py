@@ -0,0 +1,238 @@
+# Imports
+import os
+import sys
+import re
+from datetime import datetime, timedelta
+from html_scrape import save_to_json
+
+def iter_unfolded_lines(file):
+    """
+    Read an ICS file line by line, joining folded continuation lines.
+
+    Args:
+        file: File object opened in text mode
+
+    Yields:
+        Logical content lines without line endings
+    """
+    current = None
+    for line in file:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def parse_content_line(line):
+    """
+    Split a content line into its name, parameters and value.
+
+    Args:
+        line: Unfolded content line, e.g. 'DTSTART;TZID=Europe/London:20250501T080000'
+
+    Returns:
+        Tuple of (upper-case name, dictionary of parameters, raw value)
+    """
+    colon = line.find(':')
+    if colon < 0:
+        return line.upper(), {}, ''
+    quote = line.find('"', 0, colon)
+    if quote >= 0:
+        # A quoted parameter value may itself contain ':'
+        in_quotes = False
+        for i in range(quote, len(line)):
+            char = line[i]
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ':' and not in_quotes:
+                colon = i
+                break
+    head, value = line[:colon], line[colon + 1:]
+
+    name, *param_parts = head.split(';')
+    params = {}
+    for part in param_parts:
+        key, _, param_value = part.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+def unescape_text(value):
+    """
+    Undo ICS TEXT escaping (\\n, \\, \\; and \\\\).
+    """
+    return re.sub(r'\\([nN,;\\])', lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def parse_ical_datetime(value):
+    """
+    Parse an ICS DATE or DATE-TIME value into a naive datetime.
+
+    Args:
+        value: e.g. '20250501', '20250501T080000' or '20250501T080000Z'
+
+    Returns:
+        datetime object, or None if the value cannot be parsed
+    """
+    value = value.strip().rstrip('Z')
+    try:
+        if len(value) == 8:
+            return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        if len(value) == 15 and value[8] == 'T':
+            return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]),
+                            int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    except ValueError:
+        pass
+    return None
+
+_PROPERTY_NAME = re.compile(r'[A-Za-z0-9-]+')
+_USED_PROPERTIES = {'BEGIN', 'END', 'SUMMARY', 'DESCRIPTION', 'DTSTART', 'RRULE', 'EXDATE'}
+
+def iter_events(file):
+    """
+    Parse VEVENTs one at a time from an ICS file.
+
+    Only the properties needed to rebuild a meal plan are kept, and nested
+    components such as VALARM are skipped.
+
+    Args:
+        file: File object opened in text mode
+
+    Yields:
+        Dictionaries with summary, description, dtstart, rrule and exdates
+    """
+    event = None
+    depth = 0
+    for line in iter_unfolded_lines(file):
+        # Skip properties we don't use without parsing them
+        match = _PROPERTY_NAME.match(line)
+        if not match or match.group(0).upper() not in _USED_PROPERTIES:
+            continue
+        name, params, value = parse_content_line(line)
+        if name == 'BEGIN':
+            if value.upper() == 'VEVENT':
+                event = {"summary": "", "description": "", "dtstart": None, "rrule": None, "exdates": []}
+                depth = 0
+            elif event is not None:
+                depth += 1
+            continue
+        if name == 'END':
+            if event is not None:
+                if value.upper() == 'VEVENT':
+                    yield event
+                    event = None
+                else:
+                    depth -= 1
+            continue
+        if event is None or depth:
+            continue
+
+        if name == 'SUMMARY':
+            event["summary"] = unescape_text(value)
+        elif name == 'DESCRIPTION':
+            event["description"] = unescape_text(value)
+        elif name == 'DTSTART':
+            event["dtstart"] = parse_ical_datetime(value)
+        elif name == 'RRULE':
+            event["rrule"] = dict(part.partition('=')[::2] for part in value.upper().split(';'))
+        elif name == 'EXDATE':
+            event["exdates"].extend(d for d in (parse_ical_datetime(v) for v in value.split(',')) if d)
+
+def event_occurrences(event):
+    """
+    Start times of an event, expanding the daily RRULEs that
+    create_calendar(compress=True) writes.
+
+    Args:
+        event: Event dictionary from iter_events
+
+    Returns:
+        List of datetime objects
+    """
+    start = event["dtstart"]
+    rrule = event["rrule"]
+    if not rrule:
+        return [start]
+    if rrule.get('FREQ') != 'DAILY':
+        print(f"Warning: only daily repeats are supported, using first occurrence of '{event['summary']}'")
+        return [start]
+
+    interval = int(rrule.get('INTERVAL', 1))
+    if 'COUNT' in rrule:
+        count = int(rrule['COUNT'])
+    elif 'UNTIL' in rrule:
+        until = parse_ical_datetime(rrule['UNTIL'])
+        count = (until - start).days // interval + 1 if until else 1
+    else:
+        print(f"Warning: open-ended repeat, using first occurrence of '{event['summary']}'")
+        return [start]
+
+    excluded = set(event["exdates"])
+    occurrences = (start + timedelta(days=i * interval) for i in range(count))
+    return [o for o in occurrences if o not in excluded]
+
+def meal_from_event(event):
+    """
+    Rebuild a meal dictionary from an event created by create_calendar_event.
+
+    Args:
+        event: Event dictionary from iter_events
+
+    Returns:
+        Dictionary with 'text' and, if the description lists any, 'recipe_links'
+    """
+    meal = {"text": event["summary"]}
+    _, found, recipes = event["description"].partition("\n\nRecipes:")
+    if found:
+        recipe_links = {}
+        for line in recipes.split('\n'):
+            recipe_name, sep, recipe_url = line.rpartition(': ')
+            if sep:
+                recipe_links[recipe_name] = recipe_url
+        if recipe_links:
+            meal["recipe_links"] = recipe_links
+    return meal
+
+def read_meal_plan_from_ics(file_path):
+    """
+    Rebuild the {date_id: [meal, ...]} structure from an .ics file written
+    by save_calendar, reading it one line at a time.
+
+    Args:
+        file_path: Path to the .ics file
+
+    Returns:
+        Meal plan dictionary ordered by date, meals sorted by time
+    """
+    days = {}
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        for event in iter_events(f):
+            if event["dtstart"] is None:
+                continue
+            meal = meal_from_event(event)
+            for start in event_occurrences(event):
+                days.setdefault(start.date(), []).append((start.hour * 60 + start.minute, meal))
+
+    meal_plan = {}
+    for date in sorted(days):
+        meals = days[date]
+        meals.sort(key=lambda x: x[0])
+        meal_plan[f"date_cards{date.strftime('%d-%m-%Y')}"] = [meal for _, meal in meals]
+    return meal_plan
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        ics_path = sys.argv[1]
+    else:
+        ics_path = input("Enter the path to the .ics file: ")
+
+    meal_plan = read_meal_plan_from_ics(ics_path)
+    if not meal_plan:
+        print("No events found")
+        sys.exit(1)
+
+    print(f"Recovered {sum(len(m) for m in meal_plan.values())} meals over {len(meal_plan)} days")
+    save_to_json(meal_plan, filename=f"{os.path.splitext(os.path.basename(ics_path))[0]}.json")
@@ -0,0 +1,92 @@
+# Imports
+import time
+import argparse
+import threading
+import http.client
+from collections import Counter
+from urllib.parse import urlsplit
+from synthetic_planner import generate_planner_html
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+def run_load_test(base_url, clients=8, requests_per_client=20, days=28, distinct_pages=4, fmt='json'):
+    """
+    Send concurrent POST /convert requests and collect latencies.
+
+    Args:
+        base_url: URL of the running API, e.g. http://127.0.0.1:8000
+        clients: Number of concurrent clients, each on its own keep-alive connection
+        requests_per_client: Requests sent by each client
+        days: Date cards per synthetic page
+        distinct_pages: Number of different pages to cycle through, fewer
+                        pages means more identical uploads to coalesce
+        fmt: 'json' or 'ics'
+
+    Returns:
+        Dictionary with latencies in seconds, status counts and wall time
+    """
+    parts = urlsplit(base_url)
+    pages = [generate_planner_html(days=days, seed=seed).encode('utf-8') for seed in range(distinct_pages)]
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def client(client_id):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+        for i in range(requests_per_client):
+            body = pages[(client_id + i) % len(pages)]
+            start = time.perf_counter()
+            try:
+                conn.request('POST', f'/convert?format={fmt}', body=body,
+                             headers={'Content-Type': 'text/html'})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+                status = 'error'
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - wall_start
+
+    return {"latencies": latencies, "statuses": dict(statuses), "wall_time": wall_time}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the conversion API started with api_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--days", type=int, default=28, help="Date cards per synthetic page")
+    parser.add_argument("--distinct-pages", type=int, default=4)
+    parser.add_argument("--format", default="json", choices=["json", "ics"])
+    args = parser.parse_args()
+
+    results = run_load_test(args.url, args.clients, args.requests, args.days,
+                            args.distinct_pages, args.format)
+    latencies = results["latencies"]
+
+    print(f"Requests: {len(latencies)} in {results['wall_time']:.2f}s "
+          f"({len(latencies) / results['wall_time']:.1f} req/s)")
+    print(f"Status codes: {results['statuses']}")
+    for pct in (50, 90, 99):
+        print(f"p{pct}: {percentile(latencies, pct) * 1000:.1f} ms")
+    print(f"max: {max(latencies) * 1000:.1f} ms")
@@ -0,0 +1,182 @@
+# Imports
+import os
+import json
+import sys
+import time
+import argparse
+import resource
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from streamlit.testing.v1 import AppTest
+from synthetic_planner import generate_planner_html
+from load_test_api import percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# AppTest cannot drive st.file_uploader, so each session runs app.py with an
+# uploader that returns the HTML placed in its session state
+SESSION_SCRIPT = """
+import io
+import runpy
+import streamlit as st
+
+class _Upload(io.BytesIO):
+    name = "planner.html"
+
+def _file_uploader(*args, **kwargs):
+    html = st.session_state.get("_load_test_html")
+    return _Upload(html.encode("utf-8")) if html else None
+
+st.file_uploader = _file_uploader
+runpy.run_path({app_path!r}, run_name="__main__")
+"""
+
+def _quiet_worker():
+    # Discard the app's own prints in the worker processes
+    sys.stdout = open(os.devnull, 'w')
+
+def run_session(session_id, html, expected_events, timeout):
+    """
+    Simulate one user: upload a planner page, then generate the calendar.
+
+    Returns:
+        Dictionary with per-step latencies, errors and file interference found
+    """
+    result = {"session": session_id, "pid": os.getpid(), "upload": None, "generate": None,
+              "rss_peak_kb": 0, "errors": [], "interference": []}
+    try:
+        _drive_session(result, html, expected_events, timeout)
+    except Exception as e:
+        result["errors"].append(f"{type(e).__name__}: {e}")
+    result["rss_peak_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+def _drive_session(result, html, expected_events, timeout):
+    # Fills in result in place so a failure part way keeps earlier timings
+    at = AppTest.from_string(SESSION_SCRIPT.format(app_path=APP_PATH), default_timeout=timeout)
+    at.session_state["_load_test_html"] = html
+
+    start = time.perf_counter()
+    at.run()
+    result["upload"] = time.perf_counter() - start
+    if at.exception:
+        result["errors"].extend(str(e.value) for e in at.exception)
+        return
+
+    buttons = [b for b in at.button if b.label == "Generate Calendar Invites"]
+    if not buttons:
+        result["errors"].append("Generate Calendar Invites button not rendered")
+        return
+
+    start = time.perf_counter()
+    buttons[0].click().run()
+    result["generate"] = time.perf_counter() - start
+    if at.exception:
+        result["errors"].extend(str(e.value) for e in at.exception)
+        return
+
+    # The app serves the download from a shared, date-based filename, check
+    # that what is on disk is still this session's calendar
+    ics_file = os.path.join("cal_invites", f"meal_plan_{datetime.now().strftime('%Y%m%d')}.ics")
+    try:
+        with open(ics_file, 'rb') as f:
+            events = f.read().count(b"BEGIN:VEVENT")
+        if events != expected_events:
+            result["interference"].append(
+                f"{ics_file} has {events} events, this session generated {expected_events}")
+    except OSError:
+        result["interference"].append(f"{ics_file} was deleted by another session")
+
+def run_load_test(sessions=8, concurrency=8, days=28, timeout=120):
+    """
+    Run simulated sessions against app.py and collect capacity metrics.
+
+    Each session uploads a different synthetic page so that files written by
+    one session can be told apart from another's.
+
+    Args:
+        sessions: Total number of simulated sessions
+        concurrency: Sessions running at the same time
+        days: Date cards per synthetic page
+        timeout: Seconds a single script run may take
+
+    Returns:
+        Dictionary with latency percentiles, CPU, RSS, errors and interference
+    """
+    pages = []
+    for i in range(sessions):
+        html = generate_planner_html(days=days + i, seed=i)
+        pages.append((html, html.count('class="outline-box')))
+
+    usage_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    wall_start = time.perf_counter()
+
+    # AppTest keeps global runtime state, so sessions run in separate worker
+    # processes that share this working directory like sessions of one server
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=_quiet_worker) as executor:
+        futures = [executor.submit(run_session, i, html, expected_events, timeout)
+                   for i, (html, expected_events) in enumerate(pages)]
+        results = [future.result() for future in futures]
+
+    wall_time = time.perf_counter() - wall_start
+    usage_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_time = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+
+    # Peak RSS of each worker process, in MB
+    worker_rss = {}
+    for r in results:
+        worker_rss[r["pid"]] = max(worker_rss.get(r["pid"], 0), r["rss_peak_kb"] / 1024)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "days": days,
+        "wall_time_s": round(wall_time, 3),
+        "cpu_time_s": round(cpu_time, 3),
+        "cpu_utilisation": round(cpu_time / wall_time, 2) if wall_time else 0.0,
+        "rss_peak_worker_mb": round(max(worker_rss.values(), default=0), 1),
+        "rss_peak_total_mb": round(sum(worker_rss.values()), 1),
+        "errors": [e for r in results for e in r["errors"]],
+        "interference": [f"session {r['session']}: {x}" for r in results for x in r["interference"]],
+    }
+    for step in ("upload", "generate"):
+        latencies = [r[step] for r in results if r[step] is not None]
+        for pct in (50, 90, 99):
+            report[f"{step}_p{pct}_ms"] = round(percentile(latencies, pct) * 1000, 1)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent users of the Streamlit app")
+    parser.add_argument("--sessions", type=int, default=8, help="Total simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions running at once")
+    parser.add_argument("--days", type=int, default=28, help="Date cards per synthetic page")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per script run")
+    parser.add_argument("--output", help="Append the report as a JSON line to this file")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+
+    # The app clears meal_plans/ and cal_invites/ in the working directory,
+    # so run it somewhere that holds no real data
+    # Worker processes replace __main__ with the app script, so the session
+    # functions must be pickled by reference to this module's real name
+    import load_test_app
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        report = load_test_app.run_load_test(args.sessions, args.concurrency, args.days, args.timeout)
+
+    for key, value in report.items():
+        if key in ("errors", "interference"):
+            print(f"{key}: {len(value)}")
+            for item in value:
+                print(f"  {item}")
+        else:
+            print(f"{key}: {value}")
+
+    if output:
+        with open(output, 'a') as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"Report appended to {output}")
@@ -0,0 +1,259 @@
+# Imports
+import os
+import sys
+import argparse
+import numpy as np
+from calendar_invite import load_meal_plan, parse_date_from_id
+from exporters import split_meal_text
+
+COLUMNS = ('meal_id', 'date', 'minute', 'title', 'recipe_name', 'recipe_url')
+
+def merge_meal_plans(meal_plans):
+    """
+    Merge meal plans into one, so days covered by several overlapping
+    exports are only counted once.
+
+    When a date appears in more than one plan, the plan that comes later
+    wins, so pass plans oldest first.
+
+    Args:
+        meal_plans: Iterable of meal plan dictionaries
+
+    Returns:
+        Meal plan dictionary ordered by date
+    """
+    merged = {}
+    for meal_plan in meal_plans:
+        merged.update(meal_plan)
+    return dict(sorted(merged.items(), key=lambda item: parse_date_from_id(item[0])))
+
+def flatten_meal_plans(meal_plans):
+    """
+    Flatten meal plans into a columnar table with one row per meal and recipe.
+
+    The plans are first combined with merge_meal_plans, so each date comes
+    from the last plan that contains it. Meals without recipes get a single
+    row with empty recipe columns. Rows of the same meal share a meal_id, so
+    meals can be counted as well as recipes.
+
+    Args:
+        meal_plans: Iterable of meal plan dictionaries, oldest first
+
+    Returns:
+        Dictionary of equal-length NumPy arrays keyed by COLUMNS; minute is
+        the minute of the day, or -1 for meals without a time
+    """
+    meal_ids, dates, minutes, titles, recipe_names, recipe_urls = [], [], [], [], [], []
+    meal_id = 0
+
+    for date_id, meals in merge_meal_plans(meal_plans).items():
+        date = parse_date_from_id(date_id).date()
+        for meal in meals:
+            # Handle both formats (string or dict) for backward compatibility
+            if isinstance(meal, str):
+                meal_text, recipe_links = meal, {}
+            else:
+                meal_text, recipe_links = meal.get("text", ""), meal.get("recipe_links", {})
+
+            time_str, title = split_meal_text(meal_text)
+            if time_str:
+                hours, mins = time_str.split(':')
+                minute = int(hours) * 60 + int(mins)
+            else:
+                minute = -1
+
+            for recipe_name, recipe_url in (recipe_links.items() or [('', '')]):
+                meal_ids.append(meal_id)
+                dates.append(date)
+                minutes.append(minute)
+                titles.append(title)
+                recipe_names.append(recipe_name)
+                recipe_urls.append(recipe_url)
+            meal_id += 1
+
+    return {
+        'meal_id': np.array(meal_ids, dtype=np.int64),
+        'date': np.array(dates, dtype='datetime64[D]'),
+        'minute': np.array(minutes, dtype=np.int16),
+        'title': np.array(titles, dtype=object),
+        'recipe_name': np.array(recipe_names, dtype=object),
+        'recipe_url': np.array(recipe_urls, dtype=object),
+    }
+
+def to_arrow_table(table):
+    """
+    Convert a flattened table to a pyarrow.Table.
+
+    Args:
+        table: Dictionary of arrays as returned by flatten_meal_plans
+
+    Returns:
+        pyarrow.Table with the same columns
+    """
+    import pyarrow as pa
+    return pa.table({
+        'meal_id': pa.array(table['meal_id']),
+        'date': pa.array(table['date']),
+        'minute': pa.array(table['minute']),
+        'title': pa.array(table['title'], type=pa.string()),
+        'recipe_name': pa.array(table['recipe_name'], type=pa.string()),
+        'recipe_url': pa.array(table['recipe_url'], type=pa.string()),
+    })
+
+def save_to_parquet(table, filename):
+    """
+    Save a flattened table to a Parquet file in the meal_plans directory.
+
+    Args:
+        table: Dictionary of arrays as returned by flatten_meal_plans
+        filename: Name of the Parquet file
+
+    Returns:
+        The filename where data was saved
+    """
+    import pyarrow.parquet as pq
+
+    plans_dir = "meal_plans"
+    if not os.path.exists(plans_dir):
+        os.makedirs(plans_dir)
+        print(f"Created directory: {plans_dir}")
+    filename = os.path.join(plans_dir, os.path.basename(filename))
+
+    pq.write_table(to_arrow_table(table), filename)
+    print(f"Meal history saved to {filename}")
+    return filename
+
+def load_parquet(filename):
+    """
+    Load a Parquet file written by save_to_parquet back into NumPy columns.
+
+    Args:
+        filename: Path to the Parquet file
+
+    Returns:
+        Dictionary of arrays keyed by COLUMNS
+    """
+    import pyarrow.parquet as pq
+
+    arrow_table = pq.read_table(filename)
+    table = {}
+    for name in COLUMNS:
+        column = arrow_table.column(name)
+        if name in ('title', 'recipe_name', 'recipe_url'):
+            table[name] = np.array(column.to_pylist(), dtype=object)
+        else:
+            table[name] = column.to_numpy()
+    table['date'] = table['date'].astype('datetime64[D]')
+    return table
+
+def _first_row_per_meal(table):
+    # Rows of a meal are contiguous, the first one has a new meal_id
+    meal_ids = table['meal_id']
+    first = np.ones(len(meal_ids), dtype=bool)
+    first[1:] = meal_ids[1:] != meal_ids[:-1]
+    return first
+
+def meals_per_slot(table):
+    """
+    Count meals at each time of day.
+
+    Returns:
+        Tuple of (minutes of the day, meal counts), sorted by minute
+    """
+    minutes = table['minute'][_first_row_per_meal(table)]
+    return np.unique(minutes[minutes >= 0], return_counts=True)
+
+def time_of_day_histogram(table, bin_minutes=60):
+    """
+    Histogram of meal times over the day.
+
+    Args:
+        table: Dictionary of arrays as returned by flatten_meal_plans
+        bin_minutes: Width of each bin in minutes
+
+    Returns:
+        Array of meal counts, one per bin starting at midnight
+    """
+    minutes = table['minute'][_first_row_per_meal(table)]
+    minutes = minutes[minutes >= 0].astype(np.int64)
+    return np.bincount(minutes // bin_minutes, minlength=-(-1440 // bin_minutes))
+
+def recipe_rotation(table):
+    """
+    How often each recipe comes round: days used, first and last use, and
+    the mean number of days between uses.
+
+    Returns:
+        Dictionary of arrays (recipe, days_used, first_date, last_date,
+        mean_gap_days) sorted by days_used, most used first
+    """
+    has_recipe = table['recipe_name'] != ''
+    names = table['recipe_name'][has_recipe]
+    days = table['date'][has_recipe].astype(np.int64)
+    if len(names) == 0:
+        return {'recipe': np.array([], dtype=object), 'days_used': np.array([], dtype=np.int64),
+                'first_date': np.array([], dtype='datetime64[D]'),
+                'last_date': np.array([], dtype='datetime64[D]'),
+                'mean_gap_days': np.array([], dtype=float)}
+
+    recipes, codes = np.unique(names, return_inverse=True)
+
+    # Unique (recipe, day) pairs, sorted by recipe then day
+    span = days.max() - days.min() + 1
+    pairs = np.unique(codes.astype(np.int64) * span + (days - days.min()))
+    pair_codes = pairs // span
+    pair_days = pairs % span + days.min()
+
+    days_used = np.bincount(pair_codes, minlength=len(recipes))
+    starts = np.concatenate(([0], np.cumsum(days_used)[:-1]))
+    first_day = pair_days[starts]
+    last_day = pair_days[starts + days_used - 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_gap = np.where(days_used > 1, (last_day - first_day) / (days_used - 1), np.nan)
+
+    order = np.argsort(-days_used, kind='stable')
+    return {
+        'recipe': recipes[order],
+        'days_used': days_used[order],
+        'first_date': first_day[order].astype('datetime64[D]'),
+        'last_date': last_day[order].astype('datetime64[D]'),
+        'mean_gap_days': mean_gap[order],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Meal plan history analytics")
+    parser.add_argument("meal_plans", nargs="+", help="Meal plan JSON files")
+    parser.add_argument("--parquet", help="Also save the flattened history to this Parquet file")
+    parser.add_argument("--top", type=int, default=10, help="Number of recipes to list")
+    args = parser.parse_args()
+
+    # Overlapping days are taken from the most recently saved file
+    paths = sorted(args.meal_plans, key=os.path.getmtime)
+    plans = [load_meal_plan(path) for path in paths]
+    table = flatten_meal_plans(plan for plan in plans if plan)
+    if not len(table['meal_id']):
+        print("No meals found")
+        sys.exit(1)
+
+    print(f"{table['meal_id'][-1] + 1} meals, {len(table['meal_id'])} rows, "
+          f"{table['date'].min()} to {table['date'].max()}")
+
+    print("\nMeals per time slot:")
+    for minute, count in zip(*meals_per_slot(table)):
+        print(f"  {minute // 60:02d}:{minute % 60:02d}  {count}")
+
+    print("\nMeals per hour of the day:")
+    for hour, count in enumerate(time_of_day_histogram(table)):
+        if count:
+            print(f"  {hour:02d}:00  {count}")
+
+    rotation = recipe_rotation(table)
+    print(f"\nTop {args.top} recipes:")
+    for i in range(min(args.top, len(rotation['recipe']))):
+        gap = rotation['mean_gap_days'][i]
+        gap_text = f"every {gap:.1f} days" if not np.isnan(gap) else "once"
+        print(f"  {rotation['recipe'][i]}: {rotation['days_used'][i]} days, {gap_text}, "
+              f"{rotation['first_date'][i]} to {rotation['last_date'][i]}")
+
+    if args.parquet:
+        save_to_parquet(table, args.parquet)
@@ -0,0 +1,74 @@
+# Imports
+import random
+from datetime import datetime, timedelta
+
+MEAL_SLOTS = [("08:00", "Breakfast"), ("10:30", "Snack"), ("12:30", "Lunch"),
+              ("15:30", "Snack"), ("18:45", "Dinner")]
+
+RECIPES = ["Porridge with Berries", "Greek Yoghurt", "Chicken Salad", "Lentil Soup",
+           "Salmon and Rice", "Beef Stir Fry", "Vegetable Curry", "Omelette",
+           "Tuna Wrap", "Fruit Smoothie", "Turkey Chilli", "Pasta Bake"]
+
+# Odd times the planner has been seen to show, including ones that don't parse
+EDGE_CASE_TIMES = ["7:05", "00:00", "23:59", "TBC", " 09:15 ", "12:3"]
+
+def generate_planner_html(days=7, meals_per_day=4, seed=0, start_date=datetime(2025, 5, 1),
+                          edge_cases=False):
+    """
+    Generate a synthetic SenPro planner page with the markup the scraper expects.
+
+    Args:
+        days: Number of date cards
+        meals_per_day: Number of meals on each date card (at most len(MEAL_SLOTS))
+        seed: Random seed, the same arguments always give the same page
+        start_date: Date of the first date card
+        edge_cases: If True, sprinkle in markup the extractor has to cope with:
+                    missing titles, odd or unparseable times, absolute and
+                    non-recipe links, entities, extra whitespace and more
+                    times than meals
+
+    Returns:
+        HTML content as a string
+    """
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Planner</title></head><body>", '<div class="planner">']
+
+    def odd(probability=0.15):
+        return edge_cases and rng.random() < probability
+
+    for day in range(days):
+        date = start_date + timedelta(days=day)
+        slots = sorted(rng.sample(MEAL_SLOTS, min(meals_per_day, len(MEAL_SLOTS))))
+        # The planner does not list meals in time order
+        rng.shuffle(slots)
+        times = [rng.choice(EDGE_CASE_TIMES) if odd() else time_str for time_str, _ in slots]
+        if odd():
+            times.append(rng.choice(EDGE_CASE_TIMES))
+
+        parts.append(f'<div class="date_cards d-flex flex-column" id="date_cards{date.strftime("%d-%m-%Y")}">')
+        for time_str in times:
+            parts.append(f'<div class="date_card_date font-small">{time_str}</div>')
+        for _, title in slots:
+            parts.append('<div class="outline-box pb-0 px-2 pt-2 mb-2 date_card_cont">')
+            if odd():
+                pass  # No title, the extractor falls back to "Unknown Meal"
+            elif odd():
+                parts.append(f'<span>  {title} &amp; Caf&eacute;\n</span>')
+            else:
+                parts.append(f'<span>{title}</span>')
+            for recipe in rng.sample(RECIPES, rng.randint(0, 2)):
+                recipe_id = RECIPES.index(recipe) + 100
+                if odd():
+                    href = f"app.senprofessional.com/recipes/{recipe_id}"
+                elif odd():
+                    href = f"/shopping-list/{recipe_id}"
+                else:
+                    href = f"/recipes/{recipe_id}"
+                parts.append(f'<a class="mealplan" href="{href}">{recipe}</a>')
+            if odd(0.05):
+                parts.append('<a class="mealplan">Note without a link</a>')
+            parts.append('</div>')
+        parts.append('</div>')
+
+    parts.append("</div></body></html>")
+    return "\n".join(parts)